@@ -4,12 +4,414 @@ import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QPushButton, QSlider, QLabel,
                              QFileDialog, QListWidget, QStatusBar, QAction,
-                             QMessageBox, QMenu, QDialog, QFrame, QGraphicsDropShadowEffect)
+                             QMessageBox, QMenu, QDialog, QFrame, QGraphicsDropShadowEffect,
+                             QTabWidget, QDialogButtonBox)
 from PyQt5.QtGui import QIcon, QFont, QColor 
-from PyQt5.QtCore import Qt, QTimer, QUrl ,QSize
+from PyQt5.QtCore import Qt, QTimer, QUrl ,QSize, QObject, QEvent, pyqtSignal
 import vlc
 from urllib.parse import unquote
 import pickle
+import json
+import struct
+import threading
+import time
+import math
+import re
+import queue
+import sqlite3
+import inspect
+import functools
+import traceback
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Diisi Tracer kalau mode diagnostik aktif (GAP_DIAGNOSTICS=1)
+TRACER = None
+
+
+def traced(func):
+    # Catat span trace di mode diagnostik, tanpa tracer langsung panggil fungsi aslinya.
+    # Argumen lebih dari signal Qt (mis. `checked`) dipotong, sama seperti yang dilakukan PyQt
+    code = func.__code__
+    max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if max_args is not None:
+            args = args[:max_args]
+        if TRACER is None:
+            return func(*args, **kwargs)
+        start = TRACER.now_us()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            TRACER.span(func.__name__, start, TRACER.now_us())
+    return wrapper
+
+
+class Tracer:
+    # Watchdog stall event loop GUI + export Chrome trace-event JSON (buka di chrome://tracing
+    # atau Perfetto). Thread GUI mengirim heartbeat lewat QTimer; kalau heartbeat telat lebih
+    # dari STALL_THRESHOLD, thread watchdog mengambil sampel stack thread utama sampai lepas.
+    STALL_THRESHOLD = 0.2
+    HEARTBEAT_MS = 50
+    SAMPLE_INTERVAL = 0.01
+    MAX_EVENTS = 200000
+    WATCHDOG_TID = 1
+
+    def __init__(self, trace_file):
+        self.trace_file = trace_file
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self.main_tid = threading.get_ident()
+        self.last_beat = self.origin
+        self.running = True
+
+        self.heartbeat = QTimer()
+        self.heartbeat.timeout.connect(self.beat)
+        self.heartbeat.start(self.HEARTBEAT_MS)
+        self.watchdog = threading.Thread(target=self.watch, daemon=True)
+        self.watchdog.start()
+
+    def now_us(self):
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def beat(self):
+        self.last_beat = time.perf_counter()
+
+    def span(self, name, start_us, end_us, tid=None, args=None):
+        event = {"name": name, "ph": "X", "ts": start_us, "dur": end_us - start_us,
+                 "pid": self.pid, "tid": tid or self.main_tid}
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def main_stack(self):
+        frame = sys._current_frames().get(self.main_tid)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def watch(self):
+        threshold = self.STALL_THRESHOLD + self.HEARTBEAT_MS / 1000
+        while self.running:
+            time.sleep(self.SAMPLE_INTERVAL)
+            beat = self.last_beat
+            if time.perf_counter() - beat < threshold:
+                continue
+            # Stall: sampling stack thread utama sampai heartbeat berikutnya masuk
+            samples = Counter()
+            while self.running and self.last_beat == beat:
+                stack = self.main_stack()
+                if stack:
+                    samples[stack] += 1
+                    self.events.append({"name": stack[-1], "ph": "i", "s": "t", "ts": self.now_us(),
+                                        "pid": self.pid, "tid": self.main_tid, "args": {"stack": list(stack)}})
+                time.sleep(self.SAMPLE_INTERVAL)
+            if not self.running:
+                # Loop berhenti karena close() menghentikan heartbeat, bukan karena stall selesai
+                return
+            start_us = (beat - self.origin) * 1e6 + self.HEARTBEAT_MS * 1000
+            end_us = (self.last_beat - self.origin) * 1e6
+            args = {"samples": sum(samples.values())}
+            if samples:
+                args["top_stack"] = list(samples.most_common(1)[0][0])
+            self.span("GUI stall", start_us, max(end_us, start_us), tid=self.WATCHDOG_TID, args=args)
+            print(f"GUI stall {(end_us - start_us) / 1000:.0f} ms:", args.get("top_stack", ["?"])[-1])
+
+    def close(self):
+        self.running = False
+        self.heartbeat.stop()
+        # Tunggu watchdog selesai supaya events nggak berubah waktu di-dump
+        self.watchdog.join()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.main_tid, "args": {"name": "GUI"}},
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": self.WATCHDOG_TID,
+             "args": {"name": "Watchdog"}},
+        ]
+        tmp_file = self.trace_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}, f)
+            os.replace(tmp_file, self.trace_file)
+            print("Trace saved to", self.trace_file)
+        except Exception as e:
+            print("Error saving trace:", e)
+
+
+# Tabel bitrate MP3 (kbps) per [versi MPEG1 / MPEG2&2.5][layer 1..3]
+MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def skip_id3v2(data):
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def parse_mp3_frame_header(data, offset):
+    # Return dict info frame, atau None kalau bukan frame sync yang valid
+    if offset + 4 > len(data) or data[offset] != 0xFF or (data[offset + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version_bits = (b1 >> 3) & 3
+    layer_bits = (b1 >> 1) & 3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    layer = 4 - layer_bits
+    version = 1 if version_bits == 3 else 2
+    bitrate = MP3_BITRATES[(version, layer)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version_bits][rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or version == 1) else 576
+        length = (samples // 8) * bitrate // sample_rate + padding
+    return {
+        "version": version,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples": samples,
+        "length": length,
+        "mono": (b3 >> 6) == 3,
+    }
+
+
+def find_mp3_frame(data, start):
+    # Cari frame sync pertama yang diikuti frame valid berikutnya (hindari false sync)
+    offset = data.find(b"\xff", start)
+    while offset != -1 and offset + 4 <= len(data):
+        frame = parse_mp3_frame_header(data, offset)
+        if frame:
+            next_offset = offset + frame["length"]
+            if next_offset + 4 > len(data) or parse_mp3_frame_header(data, next_offset):
+                return offset, frame
+        offset = data.find(b"\xff", offset + 1)
+    return None, None
+
+
+def mp3_duration(f, file_size):
+    data = f.read(64 * 1024)
+    start = skip_id3v2(data)
+    if start + 4 > len(data):
+        f.seek(start)
+        data = f.read(64 * 1024)
+        base = start
+        start = 0
+    else:
+        base = 0
+    offset, frame = find_mp3_frame(data, start)
+    if frame is None:
+        return None
+
+    # Header VBR Xing/Info (posisi setelah side info) atau VBRI (selalu offset 32)
+    if frame["version"] == 1:
+        side_info = 17 if frame["mono"] else 32
+    else:
+        side_info = 9 if frame["mono"] else 17
+    xing = offset + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 1:
+            frames = struct.unpack(">I", data[xing + 8:xing + 12])[0]
+            return frames * frame["samples"] * 1000 // frame["sample_rate"]
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        frames = struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+        return frames * frame["samples"] * 1000 // frame["sample_rate"]
+
+    # CBR: hitung dari ukuran data audio
+    audio_bytes = file_size - (base + offset)
+    return audio_bytes * 8 * 1000 // frame["bitrate"]
+
+
+def flac_duration(f):
+    data = f.read(64 * 1024)
+    offset = skip_id3v2(data)
+    if offset:
+        f.seek(offset)
+        data = f.read(42)
+        offset = 0
+    if data[offset:offset + 4] != b"fLaC" or (data[offset + 4] & 0x7F) != 0:
+        return None
+    info = data[offset + 8:offset + 8 + 34]
+    if len(info) < 18:
+        return None
+    packed = struct.unpack(">Q", info[10:18])[0]
+    sample_rate = packed >> 44
+    total_samples = packed & 0xFFFFFFFFF
+    if sample_rate == 0 or total_samples == 0:
+        return None
+    return total_samples * 1000 // sample_rate
+
+
+def wav_duration(f, file_size):
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+    byte_rate = 0
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            if len(fmt) < 12:
+                return None
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+            if chunk_size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Ukuran data bisa 0xFFFFFFFF di file hasil streaming, batasi ke ukuran file
+            chunk_size = min(chunk_size, file_size - f.tell())
+            return chunk_size * 1000 // byte_rate
+        else:
+            f.seek(chunk_size + (chunk_size % 2), os.SEEK_CUR)
+
+
+def ogg_duration(f, file_size):
+    head = f.read(4096)
+    if head[:4] != b"OggS":
+        return None
+    if b"\x01vorbis" in head:
+        pos = head.index(b"\x01vorbis")
+        sample_rate = struct.unpack("<I", head[pos + 12:pos + 16])[0]
+    elif b"OpusHead" in head:
+        sample_rate = 48000
+    else:
+        return None
+    # Granule position halaman terakhir = total sample
+    f.seek(max(0, file_size - 64 * 1024))
+    tail = f.read()
+    pos = tail.rfind(b"OggS")
+    if pos == -1 or pos + 14 > len(tail) or not sample_rate:
+        return None
+    granule = struct.unpack("<q", tail[pos + 6:pos + 14])[0]
+    if granule <= 0:
+        return None
+    return granule * 1000 // sample_rate
+
+
+def read_header_duration(path):
+    # Durasi (ms) dari header file tanpa decode, None kalau formatnya nggak dikenali
+    ext = os.path.splitext(path)[1].lower()
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if ext == ".mp3":
+                return mp3_duration(f, file_size)
+            if ext == ".flac":
+                return flac_duration(f)
+            if ext == ".wav":
+                return wav_duration(f, file_size)
+            if ext == ".ogg":
+                return ogg_duration(f, file_size)
+    except (OSError, struct.error, IndexError) as e:
+        print("Error reading header:", path, e)
+    return None
+
+
+SORT_MODES = [
+    ("name", "Nama File"),
+    ("folder", "Folder"),
+    ("track", "Nomor Track"),
+    ("duration", "Durasi"),
+    ("added", "Tanggal Ditambah"),
+]
+
+
+def natural_key(text):
+    # "track 2" sebelum "track 10": angka dibandingkan sebagai int. re.split dengan group
+    # selalu menaruh teks di index genap dan angka di index ganjil, jadi tipenya selalu sejajar
+    parts = re.split(r"(\d+)", text.casefold())
+    return tuple(int(part) if i % 2 else part for i, part in enumerate(parts))
+
+
+def collation_keys(path):
+    # Dihitung sekali per lagu: (kunci nama, kunci folder, nomor track dari awalan nama file)
+    folder, name = os.path.split(path)
+    name_key = natural_key(name)
+    match = re.match(r"\s*(\d{1,3})(?!\d)", name)
+    track_number = int(match.group(1)) if match else float("inf")
+    return name_key, natural_key(folder), track_number
+
+
+def sniff_audio(path, size):
+    # Cek magic bytes & kewajaran header. Return (True, format) atau (False, alasan)
+    if size == 0:
+        return False, "file kosong"
+    with open(path, "rb") as f:
+        data = f.read(4096)
+        start = skip_id3v2(data)
+        if start:
+            if start >= size:
+                return False, "cuma tag ID3, tanpa audio"
+            f.seek(start)
+            data = f.read(4096)
+        if len(data) < 12:
+            return False, "file terlalu kecil"
+
+        if data[:4] == b"fLaC":
+            if (data[4] & 0x7F) != 0 or data[5:8] != b"\x00\x00\x22":
+                return False, "header FLAC rusak"
+            return True, "flac"
+        if data[:4] == b"OggS":
+            if data[4] != 0:
+                return False, "header Ogg rusak"
+            return True, "ogg"
+        if data[:4] == b"RIFF":
+            if data[8:12] != b"WAVE":
+                return False, "RIFF tapi bukan WAVE"
+            riff_size = struct.unpack("<I", data[4:8])[0]
+            # Sebagian encoder menulis ukuran file penuh (bukan ukuran - 8) di field RIFF
+            if riff_size + 8 > size + 1 and riff_size not in (size, 0xFFFFFFFF):
+                return False, "file WAV terpotong"
+            return True, "wav"
+        if data[4:8] == b"ftyp":
+            return True, "mp4"
+        if data[0] == 0xFF and (data[1] & 0xF6) == 0xF0:
+            return True, "aac"
+
+        # Frame sync MP3 bisa jauh di belakang (padding setelah tag ID3), cari di 64 KB
+        # seperti mp3_duration, tanpa batas offset
+        data += f.read(64 * 1024 - len(data))
+    offset, frame = find_mp3_frame(data, 0)
+    if frame is not None:
+        return True, "mp3"
+    return False, "format tidak dikenali"
+
+
+def format_duration(ms):
+    seconds = ms // 1000
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
 
 
 class AnimatedButton(QPushButton):
@@ -34,6 +436,881 @@ class AnimatedButton(QPushButton):
         super().leaveEvent(event)
 
 
+class SessionStore:
+    # State sesi disimpan sebagai snapshot (pickle) + journal append-only (JSON per baris).
+    # Tiap perubahan cuma nambah baris kecil ke journal, jadi biaya tulis nggak tergantung
+    # besar library. Journal dipadatkan ke snapshot kalau ukurannya sudah melewati snapshot.
+    # Penulisan + fsync jalan di thread writer sendiri, thread GUI cuma menyiapkan datanya.
+    DEBOUNCE_MS = 1000
+    MIN_COMPACT_BYTES = 64 * 1024
+
+    def __init__(self, config_dir):
+        self.snapshot_file = os.path.join(config_dir, "session.pkl")
+        self.journal_file = os.path.join(config_dir, "session.journal")
+        self.state = {
+            "playlist": [],
+            "theme": "grey",
+            "opacity": 0.9,
+            "volume": 70,
+            "track_path": None,
+            "position": 0,
+            "added": {},
+            "added_seq": 0,
+        }
+        self.generation = 0
+        self.journal_bytes = 0
+        self.snapshot_bytes = 0
+        self.pending_sets = {}
+        self.pending_entries = []
+
+        # Debounce: perubahan dikumpulkan dulu, ditulis paling sering sekali per DEBOUNCE_MS
+        self.flush_timer = QTimer()
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.DEBOUNCE_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+        # Job ditulis berurutan: ("append", data) atau ("compact", snapshot)
+        self.write_queue = queue.Queue()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def exists(self):
+        return os.path.exists(self.snapshot_file) or os.path.exists(self.journal_file)
+
+    def load(self):
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, "rb") as f:
+                    snapshot = pickle.load(f)
+                self.generation = snapshot.get("generation", 0)
+                self.state.update(snapshot.get("state", {}))
+                self.snapshot_bytes = os.path.getsize(self.snapshot_file)
+            except Exception as e:
+                print("Error loading session snapshot:", e)
+
+        if os.path.exists(self.journal_file):
+            try:
+                valid_bytes = 0
+                with open(self.journal_file, "rb") as f:
+                    for line in f:
+                        try:
+                            if not line.endswith(b"\n"):
+                                raise ValueError("incomplete entry")
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Baris terakhir terpotong (crash waktu nulis), sisanya diabaikan
+                            break
+                        valid_bytes += len(line)
+                        # Entry dari generasi lama sudah masuk snapshot. Generasi yang lebih baru
+                        # berarti compaction terakhir gagal, entry-nya tetap dipakai
+                        if entry.get("gen", 0) >= self.generation:
+                            self.apply(entry)
+                if valid_bytes != os.path.getsize(self.journal_file):
+                    os.truncate(self.journal_file, valid_bytes)
+                self.journal_bytes = valid_bytes
+            except Exception as e:
+                print("Error loading session journal:", e)
+        self.index_added(self.state["playlist"])
+
+    def apply(self, entry):
+        op = entry.get("op")
+        if op == "set":
+            self.state[entry["key"]] = entry["value"]
+        elif op == "add":
+            self.state["playlist"].extend(entry["paths"])
+            self.index_added(entry["paths"])
+        elif op == "playlist":
+            self.state["playlist"] = list(entry["paths"])
+
+    def get(self, key, default=None):
+        return self.state.get(key, default)
+
+    def set(self, key, value):
+        if key not in self.pending_sets and self.state.get(key) == value:
+            return
+        self.state[key] = value
+        self.pending_sets[key] = value
+        self.schedule_flush()
+
+    def index_added(self, paths):
+        # Urutan lagu ditambahkan, dipakai untuk sort "Tanggal Ditambah"
+        added = self.state["added"]
+        seq = self.state["added_seq"]
+        for path in paths:
+            if path not in added:
+                added[path] = seq
+                seq += 1
+        self.state["added_seq"] = seq
+
+    def add_paths(self, paths):
+        if not paths:
+            return
+        self.state["playlist"].extend(paths)
+        self.index_added(paths)
+        if self.pending_entries and self.pending_entries[-1]["op"] == "add":
+            self.pending_entries[-1]["paths"].extend(paths)
+        else:
+            self.pending_entries.append({"op": "add", "paths": list(paths)})
+        self.schedule_flush()
+
+    def replace_playlist(self, paths):
+        self.state["playlist"] = list(paths)
+        added = self.state["added"]
+        if len(added) > len(self.state["playlist"]):
+            self.state["added"] = {path: added[path] for path in self.state["playlist"] if path in added}
+        # Entry lama nggak relevan lagi, playlist baru ditulis utuh
+        self.pending_entries = [{"op": "playlist", "paths": list(paths)}]
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        # Timer nggak di-restart supaya update terus-menerus (posisi lagu) tetap tertulis
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        if not self.pending_entries and not self.pending_sets:
+            return
+        entries = self.pending_entries
+        entries.extend({"op": "set", "key": k, "value": v} for k, v in self.pending_sets.items())
+        self.pending_entries = []
+        self.pending_sets = {}
+        data = "".join(json.dumps(dict(entry, gen=self.generation)) + "\n" for entry in entries)
+        self.write_queue.put(("append", data))
+        self.journal_bytes += len(data.encode("utf-8"))
+        if self.journal_bytes > max(self.MIN_COMPACT_BYTES, self.snapshot_bytes):
+            self.compact()
+
+    def compact(self):
+        # State di-serialize sekarang supaya snapshot konsisten, penulisannya di thread writer.
+        # Append berikutnya sudah pakai generasi baru dan baru ditulis setelah snapshot ini.
+        self.generation += 1
+        try:
+            snapshot = pickle.dumps({"generation": self.generation, "state": self.state})
+        except Exception as e:
+            print("Error compacting session:", e)
+            return
+        self.snapshot_bytes = len(snapshot)
+        self.journal_bytes = 0
+        self.write_queue.put(("compact", snapshot))
+
+    def write_loop(self):
+        while True:
+            job = self.write_queue.get()
+            if job is None:
+                return
+            kind, payload = job
+            try:
+                if kind == "append":
+                    with open(self.journal_file, "a", encoding="utf-8") as f:
+                        f.write(payload)
+                        f.flush()
+                        os.fsync(f.fileno())
+                else:
+                    self.write_snapshot(payload)
+            except Exception as e:
+                print("Error saving session:", e)
+
+    def write_snapshot(self, snapshot):
+        # Snapshot ditulis ke file sementara lalu di-rename (atomic), baru journal dikosongkan.
+        # Kalau crash di antaranya, entry journal lama punya generasi lama dan dilewati saat load.
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(snapshot)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+        with open(self.journal_file, "w", encoding="utf-8"):
+            pass
+
+    def close(self):
+        self.flush_timer.stop()
+        self.flush()
+        self.compact()
+        self.write_queue.put(None)
+        self.writer.join()
+
+
+class DurationScanner(QObject):
+    # Prescan durasi di background: header parsing dulu, libvlc kalau gagal.
+    # Hasil dikirim per batch lewat signal supaya GUI nggak di-update per file.
+    durations_ready = pyqtSignal(list)
+    scan_finished = pyqtSignal()
+
+    MAX_WORKERS = 4
+    BATCH_SIZE = 64
+    VLC_PARSE_TIMEOUT = 5.0
+
+    def __init__(self, vlc_instance, cache_dir):
+        super().__init__()
+        self.vlc_instance = vlc_instance
+        self.cache_file = os.path.join(cache_dir, "durations.pkl")
+        self.cache = {}
+        self.cache_lock = threading.Lock()
+        self.cache_dirty = False
+        self.pending_batches = 0
+        self.stopping = False
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        self.load_cache()
+
+    def load_cache(self):
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "rb") as f:
+                    self.cache = pickle.load(f)
+            except Exception as e:
+                print("Error loading duration cache:", e)
+
+    def save_cache(self):
+        if not self.cache_dirty:
+            return
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with self.cache_lock:
+                with open(tmp_file, "wb") as f:
+                    pickle.dump(self.cache, f)
+                self.cache_dirty = False
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print("Error saving duration cache:", e)
+
+    def cached_duration(self, path, stat):
+        entry = self.cache.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return entry[2]
+        return None
+
+    def scan(self, paths):
+        # Semua path (termasuk yang ada di cache) dicek di worker: os.stat di NFS/HDD yang
+        # spin-down bisa lama, jadi thread GUI cuma membagi batch
+        batches = [paths[i:i + self.BATCH_SIZE] for i in range(0, len(paths), self.BATCH_SIZE)]
+        if not batches:
+            self.scan_finished.emit()
+            return
+        # Hitung semua batch dulu, supaya batch awal yang cepat selesai nggak bikin counter jadi 0
+        with self.cache_lock:
+            self.pending_batches += len(batches)
+        for batch in batches:
+            future = self.executor.submit(self.scan_batch, batch)
+            future.add_done_callback(lambda _: self.batch_done())
+
+    def is_scanning(self):
+        return self.pending_batches > 0
+
+    def batch_done(self):
+        # Dipanggil dari thread worker; counter dijaga lock yang sama dengan cache
+        with self.cache_lock:
+            self.pending_batches -= 1
+            finished = self.pending_batches == 0
+        if finished:
+            self.scan_finished.emit()
+
+    def scan_batch(self, paths):
+        results = []
+        for path in paths:
+            # Interpreter tetap join thread worker waktu exit, jadi batch yang jalan harus berhenti cepat
+            if self.stopping:
+                return
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            duration = self.cached_duration(path, stat)
+            if duration is not None:
+                results.append((path, duration))
+                continue
+            duration = read_header_duration(path)
+            if duration is None:
+                duration = self.vlc_duration(path)
+            if duration is None:
+                continue
+            with self.cache_lock:
+                self.cache[path] = (stat.st_size, stat.st_mtime_ns, duration)
+                self.cache_dirty = True
+            results.append((path, duration))
+        if results:
+            self.durations_ready.emit(results)
+
+    def vlc_duration(self, path):
+        media = self.vlc_instance.media_new(path)
+        media.parse_with_options(vlc.MediaParseFlag.local, int(self.VLC_PARSE_TIMEOUT * 1000))
+        deadline = time.monotonic() + self.VLC_PARSE_TIMEOUT
+        # Status 0 berarti parsing belum selesai
+        while media.get_parsed_status() == 0 and time.monotonic() < deadline and not self.stopping:
+            time.sleep(0.02)
+        duration = media.get_duration()
+        media.release()
+        return duration if duration > 0 else None
+
+    def shutdown(self):
+        self.stopping = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.save_cache()
+
+
+class FileValidator(QObject):
+    # Validasi file di background pakai thread pool. Hasil di-cache per (ukuran, mtime),
+    # jadi rescan cuma stat file yang nggak berubah tanpa baca isinya lagi.
+    # Naikkan CACHE_VERSION kalau aturan sniff_audio berubah supaya semua file dicek ulang.
+    # Hasilnya dikirim lewat signal: (valid, {path: alasan}, belum bisa diakses, dari import folder)
+    validated = pyqtSignal(list, dict, list, bool)
+
+    MAX_WORKERS = 8
+    CACHE_VERSION = 2
+
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.cache_file = os.path.join(cache_dir, "validation.pkl")
+        self.cache = {}
+        self.cache_lock = threading.Lock()
+        self.cache_dirty = False
+        self.stopping = False
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "rb") as f:
+                    cached = pickle.load(f)
+                if isinstance(cached, dict) and cached.get("version") == self.CACHE_VERSION:
+                    self.cache = cached["entries"]
+            except Exception as e:
+                print("Error loading validation cache:", e)
+
+    def check(self, path):
+        # Return (path, ok, alasan); alasan None kalau file-nya nggak ada atau gagal dibaca
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, False, None
+        entry = self.cache.get(path)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            return path, entry[2], entry[3]
+        try:
+            ok, reason = sniff_audio(path, stat.st_size)
+        except OSError as e:
+            # Error I/O bisa sementara (NFS, EIO), jadi nggak di-cache dan nggak dikarantina
+            print("Error validating:", path, e)
+            return path, False, None
+        with self.cache_lock:
+            self.cache[path] = (stat.st_size, stat.st_mtime_ns, ok, reason)
+            self.cache_dirty = True
+        return path, ok, reason
+
+    def validate_async(self, paths, imported=False):
+        threading.Thread(target=self.run, args=(list(paths), imported), daemon=True).start()
+
+    def run(self, paths, imported):
+        try:
+            good, bad, unavailable = self.validate(paths)
+        except RuntimeError:
+            # Executor sudah dimatikan karena aplikasi ditutup
+            return
+        if not self.stopping:
+            self.validated.emit(good, bad, unavailable, imported)
+
+    def validate(self, paths):
+        # Return (lagu valid, {path: alasan} untuk yang dikarantina, lagu yang belum bisa diakses)
+        good = []
+        bad = {}
+        unavailable = []
+        for path, ok, reason in self.executor.map(self.check, paths, chunksize=32):
+            if ok:
+                good.append(path)
+            elif reason is not None:
+                bad[path] = reason
+            else:
+                unavailable.append(path)
+        self.save_cache()
+        return good, bad, unavailable
+
+    def save_cache(self):
+        if not self.cache_dirty:
+            return
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with self.cache_lock:
+                with open(tmp_file, "wb") as f:
+                    pickle.dump({"version": self.CACHE_VERSION, "entries": self.cache}, f)
+                self.cache_dirty = False
+                os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print("Error saving validation cache:", e)
+
+    def shutdown(self):
+        self.stopping = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class Prefetcher:
+    # Panaskan page cache untuk beberapa lagu berikutnya (NFS / HDD yang spin-down):
+    # posix_fadvise(WILLNEED) lalu baca awal file di thread background, dibatasi budget byte.
+    # Tiap jadwal baru menaikkan generation, jadi bacaan yang sudah basi langsung berhenti.
+    LOOKAHEAD = 3
+    BYTES_PER_TRACK = 4 * 1024 * 1024
+    BUDGET_BYTES = 16 * 1024 * 1024
+    CHUNK_SIZE = 256 * 1024
+    COLD_READ_SECONDS = 0.2
+    STALL_SECONDS = 0.5
+    MAX_WARMED = 4 * LOOKAHEAD
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.generation = 0
+        self.pending = []
+        self.running = True
+        # Cuma lagu yang baru saja dipanaskan; yang lama dibuang karena page cache bisa sudah evict
+        self.warmed = OrderedDict()
+        self.stats = {"prefetched": 0, "bytes": 0, "cold_warmed": 0, "stalls_avoided": 0, "cold_starts": 0}
+        self.worker = threading.Thread(target=self.run, daemon=True)
+        self.worker.start()
+
+    def schedule(self, paths):
+        with self.cond:
+            self.generation += 1
+            self.pending = [path for path in paths if path not in self.warmed]
+            self.cond.notify()
+
+    def run(self):
+        buffer = bytearray(self.CHUNK_SIZE)
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                generation = self.generation
+                budget = self.BUDGET_BYTES
+                paths = self.pending
+                self.pending = []
+            for path in paths:
+                if budget <= 0 or generation != self.generation:
+                    break
+                budget -= self.prefetch(path, min(budget, self.BYTES_PER_TRACK), generation, buffer)
+
+    def prefetch(self, path, limit, generation, buffer):
+        read_bytes = 0
+        cold = False
+        try:
+            with open(path, "rb", buffering=0) as f:
+                if hasattr(os, "posix_fadvise"):
+                    os.posix_fadvise(f.fileno(), 0, limit, os.POSIX_FADV_WILLNEED)
+                while read_bytes < limit and generation == self.generation:
+                    start = time.monotonic()
+                    n = f.readinto(buffer)
+                    if read_bytes == 0 and time.monotonic() - start >= self.COLD_READ_SECONDS:
+                        cold = True
+                    if not n:
+                        break
+                    read_bytes += n
+        except OSError as e:
+            print("Error prefetching:", path, e)
+            return read_bytes
+        with self.cond:
+            # Bacaan yang dibatalkan karena jadwal baru belum tentu sudah masuk cache
+            if generation != self.generation:
+                return read_bytes
+            self.warmed[path] = cold
+            self.warmed.move_to_end(path)
+            while len(self.warmed) > self.MAX_WARMED:
+                self.warmed.popitem(last=False)
+            self.stats["prefetched"] += 1
+            self.stats["bytes"] += read_bytes
+            if cold:
+                self.stats["cold_warmed"] += 1
+        return read_bytes
+
+    def track_started(self, path, latency):
+        # Stall yang dihindari = file yang tadinya dingin (baca pertama lambat) tapi mulai cepat
+        with self.cond:
+            was_cold = self.warmed.pop(path, False)
+            if latency >= self.STALL_SECONDS:
+                self.stats["cold_starts"] += 1
+            elif was_cold:
+                self.stats["stalls_avoided"] += 1
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.generation += 1
+            self.cond.notify()
+
+
+class HistoryStore:
+    # Riwayat putar di SQLite: tabel events append-only, plus counter per lagu (stats)
+    # yang di-update di transaksi yang sama supaya query top-N cukup baca index.
+    # Penulisan lewat thread sendiri dan di-commit per batch, jadi GUI nggak pernah nunggu disk.
+    BATCH_SIZE = 200
+    COMMIT_INTERVAL = 2.0
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self.queue = queue.Queue()
+        self.reader = None
+        try:
+            conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS events (
+                    ts REAL NOT NULL,
+                    path TEXT NOT NULL,
+                    kind TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS stats (
+                    path TEXT PRIMARY KEY,
+                    plays INTEGER NOT NULL DEFAULT 0,
+                    skips INTEGER NOT NULL DEFAULT 0,
+                    completions INTEGER NOT NULL DEFAULT 0,
+                    last_played REAL NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS stats_plays ON stats (plays DESC, last_played DESC);
+                CREATE INDEX IF NOT EXISTS stats_last_played ON stats (last_played DESC);
+            """)
+            conn.close()
+        except sqlite3.Error as e:
+            print("Error opening history:", e)
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def record(self, path, kind):
+        # kind: "play", "skip" atau "complete"
+        self.queue.put((time.time(), path, kind))
+
+    def write_loop(self):
+        try:
+            conn = sqlite3.connect(self.db_file)
+            conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            print("Error opening history:", e)
+            return
+        running = True
+        while running:
+            # Idle: blok di queue tanpa timeout, jadi thread ini nggak bangun sendiri
+            item = self.queue.get()
+            batch = []
+            deadline = time.monotonic() + self.COMMIT_INTERVAL
+            while True:
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self.write_batch(conn, batch)
+        conn.close()
+
+    def write_batch(self, conn, batch):
+        # Counter dijumlahkan dulu per lagu, jadi satu upsert per lagu per batch
+        counters = {}
+        for ts, path, kind in batch:
+            plays, skips, completions, last_played = counters.get(path, (0, 0, 0, 0))
+            if kind == "play":
+                plays += 1
+                last_played = max(last_played, ts)
+            elif kind == "skip":
+                skips += 1
+            elif kind == "complete":
+                completions += 1
+            counters[path] = (plays, skips, completions, last_played)
+        try:
+            with conn:
+                conn.executemany("INSERT INTO events (ts, path, kind) VALUES (?, ?, ?)", batch)
+                conn.executemany("""
+                    INSERT INTO stats (path, plays, skips, completions, last_played)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (path) DO UPDATE SET
+                        plays = plays + excluded.plays,
+                        skips = skips + excluded.skips,
+                        completions = completions + excluded.completions,
+                        last_played = MAX(last_played, excluded.last_played)
+                """, [(path,) + values for path, values in counters.items()])
+        except sqlite3.Error as e:
+            print("Error saving history:", e)
+
+    def query(self, sql, params=()):
+        try:
+            if self.reader is None:
+                self.reader = sqlite3.connect(self.db_file)
+            return self.reader.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print("Error reading history:", e)
+            return []
+
+    def most_played(self, limit=50):
+        return self.query(
+            "SELECT path, plays FROM stats WHERE plays > 0 "
+            "ORDER BY plays DESC, last_played DESC LIMIT ?", (limit,))
+
+    def recently_played(self, limit=50):
+        return self.query(
+            "SELECT path, last_played FROM stats WHERE last_played > 0 "
+            "ORDER BY last_played DESC LIMIT ?", (limit,))
+
+    def never_played(self, paths, limit=50):
+        played = {row[0] for row in self.query("SELECT path FROM stats WHERE plays > 0")}
+        result = []
+        for path in paths:
+            if path not in played:
+                result.append(path)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join(timeout=2)
+        if self.reader is not None:
+            self.reader.close()
+
+
+class CrossfadeEngine(QObject):
+    # Dua media player bergantian: lagu berikutnya dibuka (muted & pause) sebelum
+    # jendela fade, lalu volume di-ramp berdasarkan event waktu libvlc, bukan QTimer.
+    # Event libvlc datang dari thread VLC, jadi diteruskan ke thread GUI lewat signal.
+    time_changed = pyqtSignal(int, int)
+    length_changed = pyqtSignal(int)
+    end_reached = pyqtSignal(int)
+    started_playing = pyqtSignal(int)
+    track_changed = pyqtSignal(int)
+    track_finished = pyqtSignal(int, bool)
+
+    PRELOAD_MS = 3000
+    MAX_CROSSFADE_MS = 12000
+
+    def __init__(self, vlc_instance):
+        super().__init__()
+        self.players = [vlc_instance.media_player_new() for _ in range(2)]
+        self.active = 0
+        self.index = -1
+        self.track_open = False
+        self.media_list = None
+        self.crossfade_ms = 0
+        self.volume = 70
+        self.fade = None
+        self.preloaded = None
+        self.fade_stats = {}
+        # Per slot: waktu (ms) mulai event waktu diteruskan ke GUI, None = nggak perlu sama sekali
+        self.fade_windows = [None, None]
+
+        for slot, player in enumerate(self.players):
+            events = player.event_manager()
+            events.event_attach(vlc.EventType.MediaPlayerTimeChanged, self.on_vlc_time, slot)
+            events.event_attach(vlc.EventType.MediaPlayerLengthChanged, self.on_vlc_length, slot)
+            events.event_attach(vlc.EventType.MediaPlayerEndReached, self.on_vlc_end, slot)
+            events.event_attach(vlc.EventType.MediaPlayerPlaying, self.on_vlc_playing, slot)
+        self.time_changed.connect(self.handle_time)
+        self.length_changed.connect(self.handle_length)
+        self.end_reached.connect(self.handle_end)
+        self.started_playing.connect(self.handle_playing)
+
+    # Callback thread VLC: jangan panggil libvlc di sini
+    def on_vlc_time(self, event, slot):
+        # Thread GUI cuma dibangunin menjelang jendela fade atau selama fade berjalan
+        window = self.fade_windows[slot]
+        if self.fade or (window is not None and event.u.new_time >= window):
+            self.time_changed.emit(slot, event.u.new_time)
+
+    def on_vlc_length(self, event, slot):
+        self.length_changed.emit(slot)
+
+    def on_vlc_end(self, event, slot):
+        self.end_reached.emit(slot)
+
+    def on_vlc_playing(self, event, slot):
+        self.started_playing.emit(slot)
+
+    def set_media_list(self, media_list):
+        self.media_list = media_list
+
+    def reorder(self, media_list, new_position):
+        self.media_list = media_list
+        if self.index >= 0:
+            self.index = new_position[self.index]
+        # Lagu yang sudah di-preload belum tentu masih lagu berikutnya
+        if self.preloaded and self.fade is None:
+            self.players[self.preloaded["slot"]].stop()
+            self.preloaded = None
+        self.update_fade_window()
+
+    def set_crossfade(self, seconds):
+        self.crossfade_ms = max(0, min(self.MAX_CROSSFADE_MS, int(seconds * 1000)))
+        self.update_fade_window()
+
+    def handle_length(self, slot):
+        if slot == self.active:
+            self.update_fade_window()
+
+    def update_fade_window(self):
+        # Dihitung di thread GUI dari panjang lagu; callback VLC cuma membandingkan angkanya
+        windows = [None, None]
+        if self.crossfade_ms and self.fade is None and self.index + 1 < self.count():
+            length = self.player().get_length()
+            if length > 0:
+                duration = min(self.crossfade_ms, length // 2)
+                windows[self.active] = length - duration - self.PRELOAD_MS
+        self.fade_windows = windows
+
+    def set_volume(self, value):
+        self.volume = value
+        if self.fade is None:
+            self.player().audio_set_volume(value)
+
+    def player(self):
+        return self.players[self.active]
+
+    def count(self):
+        return self.media_list.count() if self.media_list is not None else 0
+
+    def is_playing(self):
+        return bool(self.player().is_playing())
+
+    def play_index(self, index, completed=False):
+        if not 0 <= index < self.count():
+            return
+        self.finish_track(completed)
+        self.cancel_transition()
+        player = self.player()
+        player.set_media(self.media_list.item_at_index(index))
+        player.audio_set_volume(self.volume)
+        player.play()
+        self.index = index
+        self.track_open = True
+        self.update_fade_window()
+        self.track_changed.emit(index)
+
+    def finish_track(self, completed):
+        # Dilaporkan sekali per lagu: selesai sampai habis/crossfade, atau di-skip
+        if self.track_open:
+            self.track_open = False
+            self.track_finished.emit(self.index, completed)
+
+    def play(self):
+        if self.player().get_media() is None:
+            self.play_index(max(self.index, 0))
+            return
+        self.player().play()
+        if self.fade:
+            self.players[self.fade["from_slot"]].play()
+
+    def pause(self):
+        self.player().set_pause(1)
+        other = self.players[1 - self.active]
+        if self.fade or (self.preloaded and not self.preloaded["ready"]):
+            other.set_pause(1)
+
+    def next(self):
+        if self.index + 1 < self.count():
+            self.play_index(self.index + 1)
+
+    def previous(self):
+        if self.index > 0:
+            self.play_index(self.index - 1)
+
+    def cancel_transition(self):
+        # Lompat manual: hentikan player kedua dan buang fade/preload yang sedang jalan
+        if self.fade or self.preloaded:
+            if self.fade:
+                self.active = self.fade["to_slot"]
+            self.players[1 - self.active].stop()
+        self.fade = None
+        self.preloaded = None
+
+    def preload(self, index):
+        slot = 1 - self.active
+        player = self.players[slot]
+        player.set_media(self.media_list.item_at_index(index))
+        player.audio_set_volume(0)
+        player.play()
+        self.preloaded = {"slot": slot, "index": index, "ready": False}
+
+    def handle_playing(self, slot):
+        # Lagu preload sudah kebuka: tahan di posisi 0 sampai jendela fade
+        preloaded = self.preloaded
+        if preloaded and preloaded["slot"] == slot and not preloaded["ready"] and self.fade is None:
+            player = self.players[slot]
+            player.set_pause(1)
+            player.set_time(0)
+            preloaded["ready"] = True
+
+    def handle_time(self, slot, time_ms):
+        if self.fade:
+            if slot == self.fade["from_slot"]:
+                self.step_fade(time_ms)
+            return
+        if slot != self.active or not self.crossfade_ms or self.index + 1 >= self.count():
+            return
+        length = self.players[slot].get_length()
+        if length <= 0:
+            return
+        duration = min(self.crossfade_ms, length // 2)
+        fade_start = length - duration
+        if self.preloaded is None and time_ms >= fade_start - self.PRELOAD_MS:
+            self.preload(self.index + 1)
+        if time_ms >= fade_start:
+            self.begin_fade(time_ms, fade_start, duration)
+
+    def begin_fade(self, time_ms, fade_start, duration):
+        from_slot = self.active
+        to_slot = 1 - from_slot
+        if self.preloaded is None or self.preloaded["slot"] != to_slot:
+            self.preload(self.index + 1)
+        incoming = self.players[to_slot]
+        incoming.audio_set_volume(0)
+        incoming.play()
+        self.preloaded = None
+        self.fade = {
+            "from_slot": from_slot,
+            "to_slot": to_slot,
+            "start": fade_start,
+            "duration": duration,
+            "last_time": time_ms,
+            "steps": [],
+        }
+        self.fade_stats = {"start_error_ms": time_ms - fade_start}
+        self.finish_track(True)
+        self.active = to_slot
+        self.index += 1
+        self.track_open = True
+        self.track_changed.emit(self.index)
+        self.step_fade(time_ms)
+
+    def step_fade(self, time_ms):
+        fade = self.fade
+        if time_ms > fade["last_time"]:
+            fade["steps"].append(time_ms - fade["last_time"])
+        fade["last_time"] = time_ms
+        progress = min(1.0, max(0.0, (time_ms - fade["start"]) / fade["duration"]))
+        # Kurva equal-power supaya loudness total tetap rata selama fade
+        out_gain = math.cos(progress * math.pi / 2)
+        in_gain = math.sin(progress * math.pi / 2)
+        self.players[fade["from_slot"]].audio_set_volume(int(round(self.volume * out_gain)))
+        self.players[fade["to_slot"]].audio_set_volume(int(round(self.volume * in_gain)))
+        if progress >= 1.0:
+            self.finish_fade()
+
+    def finish_fade(self):
+        fade = self.fade
+        self.fade = None
+        self.players[fade["from_slot"]].stop()
+        self.players[fade["to_slot"]].audio_set_volume(self.volume)
+        self.update_fade_window()
+        steps = fade["steps"]
+        if steps:
+            self.fade_stats["max_step_ms"] = max(steps)
+            self.fade_stats["mean_step_ms"] = sum(steps) / len(steps)
+
+    def handle_end(self, slot):
+        if self.fade and slot == self.fade["from_slot"]:
+            self.finish_fade()
+        elif slot == self.active and self.fade is None:
+            self.finish_track(True)
+            if self.index + 1 < self.count():
+                self.play_index(self.index + 1, completed=True)
+
+
 class GabutAudioPlayer(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -54,22 +1331,63 @@ class GabutAudioPlayer(QMainWindow):
         # Direktori konfigurasi
         self.config_dir = os.path.expanduser("~/.config/gabutaudioplayer")
         os.makedirs(self.config_dir, exist_ok=True)
+        self.cache_dir = os.path.expanduser("~/.cache/gabutaudioplayer")
+        os.makedirs(self.cache_dir, exist_ok=True)
         self.playlist_file = os.path.join(self.config_dir, "playlist.pkl")
         self.theme_file = os.path.join(self.config_dir, "theme.pkl")
         self.opacity_file = os.path.join(self.config_dir, "opacity.pkl")
         self.playlist_count = 0
         self.playlist_paths = []
+        self.hidden_paths = []  # Ada di playlist tersimpan tapi nggak di media list
         self.current_theme = "grey"
         self.opacity = 0.9  # Default opacity
         self.drag_position = None
+        self.resume_index = None
+        self.resume_position = 0
+        self.pending_seek = None
+        self.low_power = False
+        self.shadow_widgets = []
+        self.durations = {}
+        self.total_duration = 0
+        self.sort_keys = {}
+
+        # State sesi (playlist, tema, opacity, volume, lagu & posisi terakhir)
+        self.session = SessionStore(self.config_dir)
+        if self.session.exists():
+            self.session.load()
+        else:
+            self.migrate_legacy_settings()
 
         # Inisialisasi VLC
         self.vlc_instance = vlc.Instance("--no-video-title-show")
-        self.media_player = self.vlc_instance.media_player_new()
         self.media_list = self.vlc_instance.media_list_new([])
-        self.media_list_player = self.vlc_instance.media_list_player_new()
-        self.media_list_player.set_media_player(self.media_player)
-        self.media_list_player.set_media_list(self.media_list)
+        self.history = HistoryStore(os.path.join(self.config_dir, "history.db"))
+        self.engine = CrossfadeEngine(self.vlc_instance)
+        self.engine.set_media_list(self.media_list)
+        self.engine.set_crossfade(self.session.get("crossfade", 0))
+        self.engine.track_changed.connect(lambda _: self.update_track_info())
+        self.engine.track_changed.connect(self.record_play)
+        self.engine.track_finished.connect(self.record_finished)
+        self.engine.started_playing.connect(lambda _: self.update_power_state())
+        self.engine.track_changed.connect(self.prefetch_upcoming)
+        self.engine.started_playing.connect(self.on_track_started)
+        # Ganti lagu (skip manual / crossfade) membatalkan seek resume yang belum sempat jalan
+        self.engine.track_changed.connect(lambda _: self.cancel_pending_seek())
+        self.engine.started_playing.connect(self.apply_pending_seek)
+        self.engine.length_changed.connect(self.apply_pending_seek)
+
+        # Readahead lagu berikutnya
+        self.prefetcher = Prefetcher()
+        self.pending_start = None
+
+        # Validasi file di background, yang rusak/nggak bisa dibaca disembunyikan dari media list
+        self.validator = FileValidator(self.cache_dir)
+        self.validator.validated.connect(self.on_validated)
+
+        # Prescan durasi lagu di background
+        self.duration_scanner = DurationScanner(self.vlc_instance, self.cache_dir)
+        self.duration_scanner.durations_ready.connect(self.on_durations_ready)
+        self.duration_scanner.scan_finished.connect(self.on_duration_scan_finished)
 
         # Setup UI
         self.setup_ui()
@@ -85,18 +1403,27 @@ class GabutAudioPlayer(QMainWindow):
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.update_status_bar()
+        self.duration_scanner.scan(self.playlist_paths)
 
-        # Timer update progress
+        # Timer update progress (cuma jalan selama lagu diputar & window kelihatan)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update_progress)
-        self.timer.start(1000)
+        self.last_position_save = 0.0
 
         # Volume awal
-        self.media_player.audio_set_volume(70)
+        volume = self.session.get("volume", 70)
+        self.engine.set_volume(volume)
+        self.volume_slider.setValue(volume)
 
         # Apply initial theme
         self.apply_current_theme()
 
+        # Lanjutkan lagu terakhir
+        self.restore_session()
+
+        if self.session.get("low_power", False):
+            self.set_low_power(True)
+
     def get_icon_path(self, icon_name):
         system_path = f"/usr/share/gabutaudioplayer/icons/{icon_name}"
         if os.path.exists(system_path):
@@ -104,7 +1431,32 @@ class GabutAudioPlayer(QMainWindow):
         return os.path.join(self.base_path, "icons", icon_name)
 
     def update_status_bar(self):
-        self.statusBar.showMessage(f"♪ {self.playlist_count} tracks loaded")
+        message = f"♪ {self.playlist_count} tracks loaded"
+        if self.total_duration:
+            message += f" · {format_duration(self.total_duration)}"
+        if self.duration_scanner.is_scanning():
+            message += " (scanning...)"
+        quarantined = len(self.session.get("quarantine", {}))
+        if quarantined:
+            message += f" · ⚠ {quarantined}"
+        self.statusBar.showMessage(message)
+
+    def on_durations_ready(self, results):
+        hidden = set(self.hidden_paths)
+        for path, duration in results:
+            if path in hidden:
+                # Lagu yang disembunyikan validator nggak dihitung ke total durasi
+                continue
+            if path not in self.durations:
+                self.total_duration += duration
+            else:
+                self.total_duration += duration - self.durations[path]
+            self.durations[path] = duration
+        self.update_status_bar()
+
+    def on_duration_scan_finished(self):
+        self.duration_scanner.save_cache()
+        self.update_status_bar()
 
     def setup_ui(self):
         main_widget = QWidget()
@@ -275,49 +1627,155 @@ class GabutAudioPlayer(QMainWindow):
         shadow.setYOffset(5)
         shadow.setColor(QColor(0, 0, 0, 80))
         widget.setGraphicsEffect(shadow)
-
+        if widget not in self.shadow_widgets:
+            self.shadow_widgets.append(widget)
+
+    def set_low_power(self, enabled):
+        # Shadow di-blur ulang tiap ada child yang repaint, jadi dibuang di mode hemat daya
+        self.low_power = enabled
+        for widget in self.shadow_widgets:
+            if enabled:
+                widget.setGraphicsEffect(None)
+            else:
+                self.add_shadow_effect(widget)
+        self.session.set("low_power", enabled)
+
+    def update_power_state(self, playing=None):
+        # Semua kerja periodik berhenti kalau lagu di-pause/stop, window disembunyikan atau diminimize
+        if playing is None:
+            playing = self.engine.is_playing()
+        active = playing and self.isVisible() and not self.isMinimized()
+        if active and not self.timer.isActive():
+            self.timer.start(1000)
+            self.update_progress()
+        elif not active and self.timer.isActive():
+            self.timer.stop()
+            self.save_position()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self.update_power_state()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_power_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.update_power_state()
+
+    @traced
     def toggle_playback(self):
         if self.playlist_count == 0:
             QMessageBox.warning(self, "Musik Kosong Gan, Tambah Lagu Dulu!", "Playlist not found!")
             return
-        if self.media_player.is_playing():
-            self.media_player.pause()
+        if self.engine.is_playing():
+            self.engine.pause()
             self.play_button.setIcon(self.icon_play)
+            self.save_position()
+            self.update_power_state(playing=False)
+        elif self.resume_index is not None:
+            self.engine.play_index(self.resume_index)
+            self.seek_after_start(self.resume_position)
+            self.resume_index = None
+            self.play_button.setIcon(self.icon_pause)
         else:
-            self.media_list_player.play()
+            self.engine.play()
             self.play_button.setIcon(self.icon_pause)
 
+    @traced
     def next_track(self):
-        self.media_list_player.next()
+        if self.resume_index is not None:
+            self.play_from_resume(self.resume_index + 1)
+        else:
+            self.engine.next()
 
+    @traced
     def previous_track(self):
-        self.media_list_player.previous()
+        if self.resume_index is not None:
+            self.play_from_resume(self.resume_index - 1)
+        else:
+            self.engine.previous()
+
+    def play_from_resume(self, index):
+        # Engine belum jalan (index -1), jadi langkahnya dihitung dari lagu yang ditampilkan
+        if 0 <= index < self.playlist_count:
+            self.resume_index = None
+            self.engine.play_index(index)
+            self.play_button.setIcon(self.icon_pause)
+
+    def seek_after_start(self, position):
+        # set_time baru bisa dipakai setelah input VLC jalan; seek-nya dilakukan dari event
+        # Playing/LengthChanged lagu itu, selama apa pun storage-nya butuh untuk membuka file
+        self.pending_seek = position
+
+    def apply_pending_seek(self, slot):
+        if self.pending_seek is None or slot != self.engine.active:
+            return
+        player = self.engine.player()
+        if player.get_length() > 0:
+            player.set_time(self.pending_seek)
+            self.pending_seek = None
+
+    def cancel_pending_seek(self):
+        self.pending_seek = None
+
+    def restore_session(self):
+        try:
+            index = self.playlist_paths.index(self.session.get("track_path"))
+        except ValueError:
+            return
+        self.resume_index = index
+        self.resume_position = self.session.get("position", 0)
+        self.track_info.setText(os.path.basename(self.playlist_paths[index]))
+        self.current_time.setText(self.format_time(self.resume_position))
+        # Lagu yang mau dilanjutkan ikut dipanaskan, bukan cuma lagu sesudahnya
+        self.prefetcher.schedule(self.playlist_paths[index:index + 1 + Prefetcher.LOOKAHEAD])
+
+    def save_position(self):
+        index = self.engine.index
+        if 0 <= index < len(self.playlist_paths):
+            self.session.set("track_path", self.playlist_paths[index])
+            self.session.set("position", max(0, self.engine.player().get_time()))
 
     def seek_position(self, position):
-        duration = self.media_player.get_length()
+        player = self.engine.player()
+        duration = player.get_length()
         if duration > 0:
             new_time = int(duration * (position / 100))
-            self.media_player.set_time(new_time)
+            player.set_time(new_time)
 
     def set_volume(self, value):
-        self.media_player.audio_set_volume(value)
+        self.engine.set_volume(value)
         self.volume_label.setText(f"{value}%")
+        self.session.set("volume", value)
 
+    @traced
     def update_progress(self):
-        if self.media_player.is_playing():
-            duration = self.media_player.get_length()
-            current = self.media_player.get_time()
-            if duration > 0:
-                percentage = int((current / duration) * 100)
-                self.progress_slider.blockSignals(True)
-                self.progress_slider.setValue(percentage)
-                self.progress_slider.blockSignals(False)
-                self.current_time.setText(self.format_time(current))
-                self.total_time.setText(self.format_time(duration))
-                self.update_track_info()
+        if not self.engine.is_playing():
+            self.update_power_state(playing=False)
+            return
+        player = self.engine.player()
+        duration = player.get_length()
+        current = player.get_time()
+        if duration > 0:
+            # setValue/setText sudah no-op kalau nilainya sama, jadi cuma widget yang berubah yang repaint
+            percentage = int((current / duration) * 100)
+            self.progress_slider.blockSignals(True)
+            self.progress_slider.setValue(percentage)
+            self.progress_slider.blockSignals(False)
+            self.current_time.setText(self.format_time(current))
+            self.total_time.setText(self.format_time(duration))
+            # Mode hemat daya: posisi disimpan lebih jarang supaya disk nggak terus bangun
+            interval = 30 if self.low_power else 1
+            now = time.monotonic()
+            if now - self.last_position_save >= interval:
+                self.last_position_save = now
+                self.save_position()
 
     def update_track_info(self):
-        index = self.media_list_player.get_media_player().get_media()
+        index = self.engine.player().get_media()
         if index:
             try:
                 mrl = index.get_mrl()
@@ -332,41 +1790,31 @@ class GabutAudioPlayer(QMainWindow):
         seconds %= 60
         return f"{minutes}:{seconds:02d}"
 
+    def migrate_legacy_settings(self):
+        # Pindahkan file pickle versi lama ke state sesi
+        legacy = [("playlist", self.playlist_file), ("theme", self.theme_file), ("opacity", self.opacity_file)]
+        for key, path in legacy:
+            if os.path.exists(path):
+                try:
+                    with open(path, "rb") as f:
+                        self.session.state[key] = pickle.load(f)
+                except Exception as e:
+                    print(f"Error migrating {key}:", e)
+        self.session.index_added(self.session.state["playlist"])
+        self.session.compact()
+
     def load_theme(self):
-        if os.path.exists(self.theme_file):
-            try:
-                with open(self.theme_file, "rb") as f:
-                    theme = pickle.load(f)
-                    if theme in ["grey", "transparent"]:
-                        self.current_theme = theme
-            except Exception as e:
-                print("Error loading theme:", e)
-        else:
-            self.current_theme = "grey"
+        theme = self.session.get("theme", "grey")
+        self.current_theme = theme if theme in ["grey", "transparent"] else "grey"
 
     def load_opacity(self):
-        if os.path.exists(self.opacity_file):
-            try:
-                with open(self.opacity_file, "rb") as f:
-                    self.opacity = pickle.load(f)
-            except Exception as e:
-                print("Error loading opacity:", e)
-        else:
-            self.opacity = 0.9
+        self.opacity = self.session.get("opacity", 0.9)
 
     def save_theme(self):
-        try:
-            with open(self.theme_file, "wb") as f:
-                pickle.dump(self.current_theme, f)
-        except Exception as e:
-            print("Error saving theme:", e)
+        self.session.set("theme", self.current_theme)
 
     def save_opacity(self):
-        try:
-            with open(self.opacity_file, "wb") as f:
-                pickle.dump(self.opacity, f)
-        except Exception as e:
-            print("Error saving opacity:", e)
+        self.session.set("opacity", self.opacity)
 
     def apply_current_theme(self):
         if self.current_theme == "transparent":
@@ -401,66 +1849,307 @@ class GabutAudioPlayer(QMainWindow):
         """)
         open_folder_action = menu.addAction("📁 Buka Folder")
         view_playlist_action = menu.addAction("📝 List Lagu")
+        statistics_action = menu.addAction("📊 Statistik")
+        quarantine_action = menu.addAction("⚠️ Karantina")
         grey_mode_action = menu.addAction("🌑 Soft Dark")
         transparent_mode_action = menu.addAction("🌫️ Transparent Mode")
+        crossfade_action = menu.addAction("🔀 Crossfade")
+        sort_menu = menu.addMenu("🔃 Urutkan")
+        current_sort = self.session.get("sort_mode", "added")
+        for mode, label in SORT_MODES:
+            action = sort_menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(mode == current_sort)
+            action.triggered.connect(lambda _, mode=mode: self.sort_playlist(mode))
+        low_power_action = menu.addAction("🔋 Hemat Daya")
+        low_power_action.setCheckable(True)
+        low_power_action.setChecked(self.low_power)
         open_folder_action.triggered.connect(self.open_folder)
         view_playlist_action.triggered.connect(self.view_playlist)
+        statistics_action.triggered.connect(self.view_statistics)
+        quarantine_action.triggered.connect(self.view_quarantine)
         grey_mode_action.triggered.connect(lambda: self.set_theme("grey"))
         transparent_mode_action.triggered.connect(lambda: self.show_opacity_dialog())
+        crossfade_action.triggered.connect(self.show_crossfade_dialog)
+        low_power_action.triggered.connect(self.set_low_power)
         menu.exec_(self.files_button.mapToGlobal(self.files_button.rect().bottomLeft()))
 
+    @traced
     def load_playlist(self):
-        if os.path.exists(self.playlist_file):
-            try:
-                with open(self.playlist_file, "rb") as f:
-                    self.playlist_paths = pickle.load(f)
-                    for path in self.playlist_paths:
-                        if os.path.exists(path):
-                            media = self.vlc_instance.media_new(path)
-                            self.media_list.add_media(media)
-                            self.playlist_count += 1
-                    self.update_status_bar()
-            except Exception as e:
-                print("Failed to load playlist:", e)
-
-    def closeEvent(self, event):
         try:
-            with open(self.playlist_file, "wb") as f:
-                pickle.dump(self.playlist_paths, f)
+            # Playlist langsung dimuat, validasinya jalan di background (on_validated)
+            saved_paths = self.session.get("playlist", [])
+            for path in saved_paths:
+                media = self.vlc_instance.media_new(path)
+                self.media_list.add_media(media)
+                self.playlist_paths.append(path)
+                self.playlist_count += 1
+            self.validator.validate_async(saved_paths)
         except Exception as e:
-            print("Failed to save playlist:", e)
+            print("Failed to load playlist:", e)
+
+    def on_validated(self, good, bad, unavailable, imported):
+        if imported:
+            self.import_validated(good, bad, unavailable)
+            return
+        # File yang belum bisa diakses (share NFS belum di-mount, error I/O) dan yang
+        # dikarantina tetap ada di playlist tersimpan, cuma nggak masuk media list. Jadi
+        # kalau share-nya sudah ada atau validator diperbaiki, lagunya balik lagi
+        hidden = unavailable + list(bad)
+        self.hidden_paths.extend(hidden)
+        if hidden:
+            self.hide_paths(set(hidden))
+        self.update_quarantine(good, bad)
+        self.update_status_bar()
+
+    def hide_paths(self, hidden):
+        paths = self.playlist_paths
+        keep = [i for i, path in enumerate(paths) if path not in hidden]
+        if len(keep) == len(paths):
+            return
+
+        # Sama seperti sort_playlist: media list dibangun ulang sekali jalan
+        old_list = self.media_list
+        new_list = self.vlc_instance.media_list_new([])
+        new_list.lock()
+        for i in keep:
+            media = old_list.item_at_index(i)
+            new_list.add_media(media)
+            media.release()
+        new_list.unlock()
+        self.media_list = new_list
+        self.playlist_paths = [paths[i] for i in keep]
+        self.playlist_count = len(keep)
+
+        # Lagu yang dibuang dipetakan ke lagu sebelumnya, jadi kalau yang lagi diputar ikut
+        # dibuang, lagu berikutnya tetap lagu sesudahnya di playlist
+        new_position = [0] * len(paths)
+        position = -1
+        for i, path in enumerate(paths):
+            if path not in hidden:
+                position += 1
+            new_position[i] = position
+        self.engine.reorder(new_list, new_position)
+        old_list.release()
+        for path in hidden:
+            duration = self.durations.pop(path, None)
+            if duration is not None:
+                self.total_duration -= duration
+        if self.resume_index is not None:
+            if paths[self.resume_index] in hidden:
+                # track_path tetap disimpan, siapa tahu lagunya bisa dibaca lagi nanti
+                self.resume_index = None
+                self.track_info.setText("Ready to play...")
+                self.current_time.setText(self.format_time(0))
+            else:
+                self.resume_index = new_position[self.resume_index]
+        if self.engine.index >= 0:
+            index = self.engine.index
+            self.prefetcher.schedule(self.playlist_paths[index + 1:index + 1 + Prefetcher.LOOKAHEAD])
+
+    def update_quarantine(self, good, bad):
+        quarantine = dict(self.session.get("quarantine", {}))
+        for path in good:
+            quarantine.pop(path, None)
+        quarantine.update(bad)
+        self.session.set("quarantine", quarantine)
+
+    def view_quarantine(self):
+        dialog = QDialog(self)
+        quarantine = self.session.get("quarantine", {})
+        dialog.setWindowTitle(f"Karantina ({len(quarantine)})")
+        dialog.setFixedSize(500, 500)
+        layout = QVBoxLayout(dialog)
+        list_widget = QListWidget()
+        for path, reason in sorted(quarantine.items()):
+            list_widget.addItem(f"{os.path.basename(path)}  — {reason}")
+            list_widget.item(list_widget.count() - 1).setToolTip(path)
+        layout.addWidget(list_widget)
+        dialog.exec_()
+
+    def closeEvent(self, event):
+        if self.resume_index is None:
+            self.save_position()
+        self.session.close()
+        self.duration_scanner.shutdown()
+        self.validator.shutdown()
+        self.prefetcher.close()
+        if TRACER is not None:
+            print("Prefetch stats:", self.prefetcher.stats)
+        self.history.close()
         event.accept()
 
+    @traced
     def open_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Pilih Folder Lagu")
         if folder:
             valid_ext = ('.mp3', '.wav', '.flac', '.ogg', '.m4a', '.aac')
-            for root, _, filenames in os.walk(folder):
-                for f in filenames:
+            candidates = []
+            for root, dirnames, filenames in os.walk(folder):
+                # Urutan os.walk tergantung filesystem, jadi diurutkan natural dulu
+                dirnames.sort(key=natural_key)
+                for f in sorted(filenames, key=natural_key):
                     if f.lower().endswith(valid_ext):
-                        self.add_to_playlist(os.path.join(root, f))
+                        candidates.append(os.path.join(root, f))
+            self.validator.validate_async(candidates, imported=True)
+
+    def import_validated(self, added, bad, unavailable):
+        for path in added:
+            self.add_to_playlist(path)
+        # Yang gagal dibaca atau dikarantina tetap disimpan, dicek lagi waktu start berikutnya
+        hidden = unavailable + list(bad)
+        self.hidden_paths.extend(hidden)
+        self.session.add_paths(hidden)
+        self.update_quarantine(added, bad)
+        self.update_status_bar()
+        self.duration_scanner.scan(added)
+        # Lagu terakhir mungkin sekarang punya lagu berikutnya untuk di-crossfade
+        self.engine.update_fade_window()
+        sort_mode = self.session.get("sort_mode", "added")
+        if sort_mode != "added":
+            self.sort_playlist(sort_mode)
 
     def add_to_playlist(self, file):
         media = self.vlc_instance.media_new(file)
         self.media_list.add_media(media)
         self.playlist_paths.append(file)
+        self.session.add_paths([file])
         self.playlist_count += 1
         self.update_status_bar()
 
+    def prefetch_upcoming(self, index):
+        if 0 <= index < len(self.playlist_paths):
+            self.pending_start = (self.playlist_paths[index], time.monotonic())
+        # Belum ada mode shuffle, jadi lagu berikutnya = urutan media list
+        self.prefetcher.schedule(self.playlist_paths[index + 1:index + 1 + Prefetcher.LOOKAHEAD])
+
+    def on_track_started(self, slot):
+        if self.pending_start is None or slot != self.engine.active:
+            return
+        path, started = self.pending_start
+        self.pending_start = None
+        self.prefetcher.track_started(path, time.monotonic() - started)
+
+    def record_play(self, index):
+        if 0 <= index < len(self.playlist_paths):
+            self.history.record(self.playlist_paths[index], "play")
+
+    def record_finished(self, index, completed):
+        if 0 <= index < len(self.playlist_paths):
+            self.history.record(self.playlist_paths[index], "complete" if completed else "skip")
+
+    @traced
+    def view_statistics(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Statistik")
+        dialog.setFixedSize(500, 500)
+        layout = QVBoxLayout(dialog)
+        tabs = QTabWidget()
+        index_of = {path: i for i, path in enumerate(self.playlist_paths)}
+
+        def add_tab(title, rows):
+            list_widget = QListWidget()
+            paths = []
+            for path, label in rows:
+                list_widget.addItem(f"{os.path.basename(path)}  {label}".rstrip())
+                paths.append(path)
+
+            def on_double_click(item):
+                index = index_of.get(paths[list_widget.row(item)])
+                if index is not None:
+                    self.resume_index = None
+                    self.engine.play_index(index)
+                    self.play_button.setIcon(self.icon_pause)
+
+            list_widget.itemDoubleClicked.connect(on_double_click)
+            tabs.addTab(list_widget, title)
+
+        add_tab("Paling Sering", [(path, f"[{plays}x]") for path, plays in self.history.most_played()])
+        add_tab("Terakhir Diputar", [
+            (path, time.strftime("[%d/%m %H:%M]", time.localtime(last_played)))
+            for path, last_played in self.history.recently_played()])
+        add_tab("Belum Pernah", [(path, "") for path in self.history.never_played(self.playlist_paths)])
+        layout.addWidget(tabs)
+        stats = self.prefetcher.stats
+        prefetch_label = QLabel(f"Prefetch: {stats['prefetched']} lagu, {stats['bytes'] // (1024 * 1024)} MB · "
+                                f"stall dihindari {stats['stalls_avoided']} · cold start {stats['cold_starts']}")
+        prefetch_label.setFont(QFont("Poppins", 8))
+        layout.addWidget(prefetch_label)
+        dialog.exec_()
+
+    @traced
+    def sort_playlist(self, mode):
+        paths = self.playlist_paths
+        for path in paths:
+            if path not in self.sort_keys:
+                self.sort_keys[path] = collation_keys(path)
+        keys = self.sort_keys
+        if mode == "name":
+            sort_key = lambda i: keys[paths[i]][0]
+        elif mode == "folder":
+            sort_key = lambda i: (keys[paths[i]][1], keys[paths[i]][0])
+        elif mode == "track":
+            sort_key = lambda i: (keys[paths[i]][1], keys[paths[i]][2], keys[paths[i]][0])
+        elif mode == "duration":
+            durations = self.durations
+            sort_key = lambda i: (durations.get(paths[i], float("inf")), keys[paths[i]][0])
+        else:
+            added = self.session.get("added", {})
+            sort_key = lambda i: added.get(paths[i], float("inf"))
+        order = sorted(range(len(paths)), key=sort_key)
+        self.session.set("sort_mode", mode)
+        if order == list(range(len(paths))):
+            return
+
+        # Media list VLC dibangun ulang sekali jalan, objek Media yang lama dipakai lagi
+        old_list = self.media_list
+        new_list = self.vlc_instance.media_list_new([])
+        new_list.lock()
+        for i in order:
+            media = old_list.item_at_index(i)
+            new_list.add_media(media)
+            media.release()
+        new_list.unlock()
+        self.media_list = new_list
+        self.playlist_paths = [paths[i] for i in order]
+
+        new_position = [0] * len(order)
+        for position, i in enumerate(order):
+            new_position[i] = position
+        self.engine.reorder(new_list, new_position)
+        old_list.release()
+        if self.resume_index is not None:
+            # Engine belum jalan jadi save_position() nggak nyimpan apa-apa; simpan lagu resume langsung
+            self.resume_index = new_position[self.resume_index]
+            self.session.set("track_path", self.playlist_paths[self.resume_index])
+        self.session.replace_playlist(self.playlist_paths + self.hidden_paths)
+        self.save_position()
+        if self.engine.index >= 0:
+            index = self.engine.index
+            self.prefetcher.schedule(self.playlist_paths[index + 1:index + 1 + Prefetcher.LOOKAHEAD])
+
+    @traced
     def view_playlist(self):
         dialog = QDialog(self)
-        dialog.setWindowTitle("Daftar Lagu")
+        title = "Daftar Lagu"
+        if self.total_duration:
+            title += f" ({format_duration(self.total_duration)})"
+        dialog.setWindowTitle(title)
         dialog.setFixedSize(500, 500)
         layout = QVBoxLayout(dialog)
         list_widget = QListWidget()
         for path in self.playlist_paths:
-            list_widget.addItem(os.path.basename(path))
+            name = os.path.basename(path)
+            duration = self.durations.get(path)
+            if duration is not None:
+                name += f"  [{format_duration(duration)}]"
+            list_widget.addItem(name)
 
         def on_double_click(item):
             index = list_widget.row(item)
             if index >= 0:
-                self.media_list_player.play_item_at_index(index)
-                self.media_player.play()
+                self.resume_index = None
+                self.engine.play_index(index)
                 self.play_button.setIcon(self.icon_pause)
 
         list_widget.itemDoubleClicked.connect(on_double_click)
@@ -486,16 +2175,47 @@ class GabutAudioPlayer(QMainWindow):
         layout.addWidget(buttons)
         dialog.exec_()
 
+    def show_crossfade_dialog(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Crossfade")
+        dialog.setFixedSize(300, 150)
+        layout = QVBoxLayout(dialog)
+        seconds = self.session.get("crossfade", 0)
+        label = QLabel(f"Crossfade: {seconds} s")
+        slider = QSlider(Qt.Horizontal)
+        slider.setRange(0, 12)
+        slider.setValue(seconds)
+        slider.valueChanged.connect(lambda val: label.setText(f"Crossfade: {val} s"))
+        slider.sliderReleased.connect(lambda: self.set_crossfade(slider.value()))
+        layout.addWidget(label)
+        layout.addWidget(slider)
+        stats = self.engine.fade_stats
+        if "max_step_ms" in stats:
+            stats_label = QLabel(f"Fade terakhir: telat {stats['start_error_ms']} ms, "
+                                 f"step maks {stats['max_step_ms']} ms")
+            stats_label.setFont(QFont("Poppins", 8))
+            layout.addWidget(stats_label)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok)
+        buttons.accepted.connect(dialog.accept)
+        layout.addWidget(buttons)
+        dialog.exec_()
+
+    def set_crossfade(self, seconds):
+        self.engine.set_crossfade(seconds)
+        self.session.set("crossfade", seconds)
+
     def set_custom_opacity(self, val):
         self.opacity = val / 100
         self.set_theme("transparent")
         self.save_opacity()
 
+    @traced
     def set_theme(self, theme):
         self.current_theme = theme
         self.apply_current_theme()
         self.save_theme()
 
+    @traced
     def apply_current_theme(self):
         if self.current_theme == "transparent":
             self.set_transparent_mode_styles()
@@ -823,8 +2543,63 @@ class GabutAudioPlayer(QMainWindow):
         self.volume_slider.setStyleSheet(self.get_slider_style("transparent"))
 
 
+class PowerStatsApplication(QApplication):
+    # Dipakai kalau GAP_POWER_STATS=1: hitung wakeup event loop (timer & queued call)
+    # dan waktu paint, dilaporkan ke stdout tiap REPORT_INTERVAL detik
+    REPORT_INTERVAL = 5.0
+
+    def __init__(self, argv):
+        super().__init__(argv)
+        self.wakeups = 0
+        self.paints = 0
+        self.paint_time = 0.0
+        self.paint_depth = 0
+        self.window_start = time.monotonic()
+
+    def notify(self, receiver, event):
+        event_type = event.type()
+        if event_type == QEvent.Paint:
+            # Paint bisa nested (graphics effect), yang dihitung cuma paint terluar
+            self.paint_depth += 1
+            start = time.perf_counter()
+            try:
+                return super().notify(receiver, event)
+            finally:
+                self.paint_depth -= 1
+                if self.paint_depth == 0:
+                    self.paint_time += time.perf_counter() - start
+                    self.paints += 1
+        if event_type in (QEvent.Timer, QEvent.MetaCall):
+            self.wakeups += 1
+            self.report()
+        return super().notify(receiver, event)
+
+    def report(self):
+        # Laporan ditumpangkan ke wakeup yang sudah ada, jadi nggak nambah timer sendiri
+        elapsed = time.monotonic() - self.window_start
+        if elapsed < self.REPORT_INTERVAL:
+            return
+        paint_ms = self.paint_time * 1000 / self.paints if self.paints else 0.0
+        print(f"Power: {self.wakeups / elapsed:.1f} wakeups/s, {self.paints / elapsed:.1f} paints/s, "
+              f"{paint_ms:.2f} ms/paint")
+        self.wakeups = 0
+        self.paints = 0
+        self.paint_time = 0.0
+        self.window_start = time.monotonic()
+
+
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    if os.environ.get("GAP_POWER_STATS"):
+        app = PowerStatsApplication(sys.argv)
+    else:
+        app = QApplication(sys.argv)
+    if os.environ.get("GAP_DIAGNOSTICS"):
+        trace_dir = os.path.expanduser("~/.cache/gabutaudioplayer")
+        os.makedirs(trace_dir, exist_ok=True)
+        TRACER = Tracer(os.path.join(trace_dir, time.strftime("trace-%Y%m%d-%H%M%S.json")))
     window = GabutAudioPlayer()
     window.show()
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    if TRACER is not None:
+        TRACER.close()
+    sys.exit(exit_code)